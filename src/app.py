@@ -1,24 +1,43 @@
+import atexit
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from ipaddress import IPv4Address, IPv6Address
-from logging.handlers import TimedRotatingFileHandler
-from typing import Literal
+from logging.handlers import MemoryHandler, TimedRotatingFileHandler
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from ipget.alchemy import AlchemyDB, get_database
-from ipget.healthchecks import get_healthcheck
 from ipget.helpers import custom_namer
-from ipget.ipget import get_current_ip, get_previous_ip
-from ipget.notifications import get_discord
-from ipget.settings import AppSettings, LoggerSettings
+from ipget.ipget import (
+    get_current_ip,
+    read_cached_ip,
+    write_cached_ip,
+    write_current_ip,
+)
+from ipget.settings import get_app_settings, get_logger_settings
+
+if TYPE_CHECKING:
+    from ipget.alchemy import AlchemyDB
+    from ipget.notifications import Discord
 
 log = logging.getLogger("ipget")
 
+_FILE_FORMATTER = logging.Formatter(
+    "%(asctime)s %(name)-19s[%(lineno)3d]%(levelname)7s: %(message)s",
+    "%Y-%m-%d %H:%M:%S",
+)
+_CONSOLE_FORMATTER = logging.Formatter(
+    "%(asctime)s %(name)-19s[%(lineno)3d] %(levelname)7s: %(message)s",
+    "%H:%M:%S",
+)
 
-def setup_logging() -> None:
-    """Setup file and console logging."""
-    log_settings = LoggerSettings()
-    log_dir = log_settings.file_path
-    log_dir.mkdir(parents=True, exist_ok=True)
+
+def _buffered_file_handler(log_dir: Path) -> MemoryHandler:
+    """Create the rotating log file handler, buffered until exit or an error."""
+    try:
+        log_dir.mkdir(parents=True)
+    except FileExistsError:
+        pass
     file_handler = TimedRotatingFileHandler(
         log_dir / "ipget.log",
         when="W0",
@@ -26,67 +45,129 @@ def setup_logging() -> None:
         encoding="utf8",
     )
     file_handler.namer = custom_namer
-    file_handler.setFormatter(logging.Formatter(""))
-    log.addHandler(file_handler)
-    log.critical("")
-    file_handler.setFormatter(
-        logging.Formatter(
-            "%(asctime)s %(name)-19s[%(lineno)3d]%(levelname)7s: %(message)s",
-            "%Y-%m-%d %H:%M:%S",
-        )
+    file_handler.setFormatter(_FILE_FORMATTER)
+    # Blank line to separate each run in the log file
+    if file_handler.stream:
+        file_handler.stream.write("\n")
+    # Buffer file writes, flushing once at exit, or immediately on errors
+    buffered_handler = MemoryHandler(
+        capacity=1000,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True,
     )
+    atexit.register(buffered_handler.close)
+    return buffered_handler
+
+
+def setup_logging() -> None:
+    """Setup file and console logging."""
+    log_settings = get_logger_settings()
+    if not log_settings.stdout_only:
+        log.addHandler(_buffered_file_handler(log_settings.file_path))
     log_level = log_settings.level
     log.setLevel(log_level.upper() if isinstance(log_level, str) else log_level)
     console_handler = logging.StreamHandler()
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
     log.addHandler(console_handler)
-    console_handler.setFormatter(
-        logging.Formatter(
-            "%(asctime)s %(name)-19s[%(lineno)3d] %(levelname)7s: %(message)s",
-            "%H:%M:%S",
-        )
-    )
+
+
+def _notify_success(notify: "Discord", previous_ip, current_ip) -> None:
+    """Send the IP change notification, logging rather than raising any error."""
+    try:
+        notify.notify_success(previous_ip, current_ip)
+    except Exception as e:
+        log.exception(e)
 
 
 def main() -> int:
     setup_logging()
-    config = AppSettings()
+    # Deferred, so heavy dependencies (e.g. SQLAlchemy) are only imported when run
+    from ipget.alchemy import get_database
+    from ipget.healthchecks import get_healthcheck
+    from ipget.notifications import get_discord
 
-    db: AlchemyDB = get_database(mode=config.db_type)
+    config = get_app_settings()
+    cached_ip = read_cached_ip(config.ip_cache_file) if config.ip_cache_file else None
 
-    previous_ip: IPv4Address | IPv6Address | Literal["Unknown"] | None = (
-        get_previous_ip(db)
-    )
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # Overlap the IP lookup's network round-trip with database setup
+        ip_request = executor.submit(get_current_ip)
+        db: AlchemyDB = get_database(mode=config.db_type)
+        atexit.register(db.close)
+        if config.upgrade_database:
+            db.upgrade_table()
+        notify = get_discord()
+        hc = get_healthcheck()
 
-    current_ip = None
-    error_list = []
-    notify = get_discord()
-    try:
-        current_ip = get_current_ip()
-        log.info(f"Current IP: {current_ip}")
-        db.write_data(datetime.now(timezone.utc), current_ip)
-    except Exception as e:
-        log.exception(e)
-        if notify:
-            notify.notify_error([e])
-        error_list.append(e)
-
-    hc = get_healthcheck()
-    if current_ip:
-        if hc:
-            hc.success({"ip": current_ip})
-        if current_ip != previous_ip:
-            if previous_ip:
-                log.info(f"IP address has changed: '{previous_ip}' → '{current_ip}'")
+        previous_ip: str | None = None
+        current_ip = None
+        notify_thread: threading.Thread | None = None
+        error_list: list[Exception] = []
+        pending: list[Future] = []
+        try:
+            current_ip = ip_request.result()
+            log.info(f"Current IP: {current_ip}")
+            if hc:
+                # The ping does not depend on the database, send it during the write
+                pending.append(executor.submit(hc.success, {"ip": current_ip}))
+            if cached_ip == str(current_ip):
+                log.debug("IP address matches the cached IP, skipping database write")
+                previous_ip = cached_ip
+            else:
+                now = datetime.now(timezone.utc)
+                previous_ip = write_current_ip(db, now, current_ip)
+                if config.ip_cache_file:
+                    # The cache only saves database writes, failing to update it
+                    # must not fail the run
+                    try:
+                        write_cached_ip(config.ip_cache_file, current_ip)
+                    except OSError as e:
+                        log.warning(f"Failed to write IP cache file: {e}")
+        except Exception as e:
+            log.exception(e)
             if notify:
-                notify.notify_success(previous_ip, current_ip)
-        else:
-            log.info("IP address has not changed")
-    elif hc:
-        hc.fail()
+                notify.notify_error([e])
+            error_list.append(e)
 
-    if error_list:
-        if notify:
+        if current_ip and error_list:
+            # The previous IP comes from the failed write, so it is not known
+            log.warning("Database write failed, skipping IP change check")
+        elif current_ip:
+            if str(current_ip) != previous_ip:
+                if previous_ip:
+                    log.info(
+                        f"IP address has changed: '{previous_ip}' → '{current_ip}'"
+                    )
+                if notify:
+                    # Sent in the background, overlapping the remaining tasks
+                    notify_thread = threading.Thread(
+                        target=_notify_success,
+                        args=(notify, previous_ip, current_ip),
+                        daemon=True,
+                    )
+                    notify_thread.start()
+            else:
+                log.info("IP address has not changed")
+        elif hc:
+            hc.fail()
+
+        for task in wait(pending).done:
+            if isinstance(error := task.exception(), Exception):
+                log.exception(error)
+                error_list.append(error)
+
+    if notify_thread:
+        # The new IP is already recorded, so this is the only chance to send it
+        notify_thread.join()
+
+    if notify:
+        if error_list:
             notify.notify_error(error_list)
+        # Send anything still queued by the notifier
+        notify.flush()
+
+    if error_list:
         log.debug("Exit code 1")
         return 1
     else:
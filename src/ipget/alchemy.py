@@ -1,15 +1,32 @@
 import logging
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime
+from functools import cache, lru_cache
 from ipaddress import IPv4Address, IPv6Address
-from ipaddress import ip_address as IPAddress
+from os import environ
 from pathlib import Path
+from typing import Any
+from weakref import WeakSet
 
 import sqlalchemy as db
 from sqlalchemy import URL, String
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.orm import Mapped, Session, declarative_base, mapped_column
 
+from ipget.environment import (
+    GENERIC_DB_DATABASE_NAME_ENV,
+    GENERIC_DB_HOST_ENV,
+    GENERIC_DB_PASSWORD_ENV,
+    GENERIC_DB_PORT_ENV,
+    GENERIC_DB_USERNAME_ENV,
+)
 from ipget.errors import ConfigurationError
-from ipget.settings import GenericDatabaseSettings, SQLiteDatabaseSettings
+from ipget.settings import (
+    GenericDatabaseSettings,
+    SQLiteDatabaseSettings,
+    get_sqlite_settings,
+)
 
 log = logging.getLogger(__name__)
 
@@ -17,6 +34,28 @@ Base = declarative_base()
 
 TABLE_NAME = "public_ip_address"
 
+_QUERY_CACHE_SIZE = 1200
+_INSERT_PAGE_SIZE = 10_000
+# Engines whose table is known to exist, so later instances skip the probe query
+_TABLE_READY: WeakSet[db.Engine] = WeakSet()
+
+# Applied to every new SQLite connection, after the configurable `journal_mode`
+# and `synchronous` pragmas. These default to WAL with `synchronous=NORMAL`, which
+# makes each commit a single append to the log, rather than an fsync'd rollback journal.
+SQLITE_PRAGMAS: tuple[tuple[str, str], ...] = (
+    ("busy_timeout", "5000"),
+    ("temp_store", "MEMORY"),
+    ("cache_size", "-2000"),
+)
+
+_GENERIC_DB_REQUIRED_ENV = (
+    GENERIC_DB_USERNAME_ENV,
+    GENERIC_DB_PASSWORD_ENV,
+    GENERIC_DB_HOST_ENV,
+    GENERIC_DB_PORT_ENV,
+    GENERIC_DB_DATABASE_NAME_ENV,
+)
+
 
 class IPInfo(Base):  # type: ignore
     """Represents IP information stored in the database table."""
@@ -27,27 +66,120 @@ class IPInfo(Base):  # type: ignore
         primary_key=True, nullable=False, autoincrement=True
     )
     time: Mapped[datetime] = mapped_column(nullable=False)
-    ip_address: Mapped[str] = mapped_column(String(80), nullable=True)
+    # 45 characters fits the longest textual IPv6 address (IPv4-mapped)
+    ip_address: Mapped[str] = mapped_column(String(45), nullable=True)
+
+    # Covers `get_last`, which only needs the newest `time` and its `ip_address`
+    __table_args__ = (
+        db.Index(
+            f"ix_{TABLE_NAME}_time_desc",
+            time.desc(),
+            ip_address,
+            postgresql_include=["ID"],
+        ),
+    )
+
+
+_TIME_INDEX = next(iter(IPInfo.__table__.indexes))
+_LAST_ROW_QUERY = db.select(IPInfo).order_by(IPInfo.time.desc()).limit(1)
+_LAST_IP_QUERY = db.select(IPInfo.ip_address).order_by(IPInfo.time.desc()).limit(1)
+_TABLE_PROBE = db.select(IPInfo.ID).limit(0)
+
+
+@lru_cache(maxsize=256)
+def _ip_to_str(ip: IPv4Address | IPv6Address) -> str:
+    """Return the text form of `ip`, cached as the IP rarely changes between writes."""
+    return ip.compressed
+
+
+def _get_engine(
+    url: URL, pragmas: tuple[tuple[str, str], ...] = (), **kwargs
+) -> db.Engine:
+    """Return the engine for `url`, creating it on first use.
+
+    Engines are shared by URL, so their connection pool and SQLAlchemy's compiled
+    statement cache survive across `AlchemyDB` instances in the same process.
+    In-memory SQLite databases are never shared, as every engine
+    would otherwise point at the same database.
+
+    Args:
+        url (URL): The SQLAlchemy connection URL.
+        pragmas (tuple[tuple[str, str], ...]): SQLite `PRAGMA` name/value pairs,
+        set on every new connection.
+        **kwargs: Passed to `sqlalchemy.create_engine`, when the engine is created.
+
+    Returns:
+        sqlalchemy.engine: The SQLAlchemy engine object.
+    """
+    if url.database == ":memory:":
+        return _build_engine(url, pragmas, **kwargs)
+    return _cached_engine(url, pragmas, **kwargs)
+
+
+def _build_engine(
+    url: URL, pragmas: tuple[tuple[str, str], ...], **kwargs
+) -> db.Engine:
+    engine = db.create_engine(
+        url,
+        query_cache_size=_QUERY_CACHE_SIZE,
+        insertmanyvalues_page_size=_INSERT_PAGE_SIZE,
+        **kwargs,
+    )
+    if pragmas:
+        _listen_set_pragmas(engine, pragmas)
+    return engine
+
+
+_cached_engine = lru_cache(maxsize=8)(_build_engine)
+
+
+def _listen_set_pragmas(
+    engine: db.Engine, pragmas: tuple[tuple[str, str], ...]
+) -> None:
+    """Set the given SQLite `PRAGMA`s on each new connection made by `engine`."""
+
+    @db.event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
 
 
 class AlchemyDB:
     """Abstract base class for interacting with the database using SQLAlchemy."""
 
-    def __init__(self) -> None:
-        """Initialise AlchemyDB, creating the necessary table."""
+    dialect: str  # This attribute is given by sub-classes
+
+    def __init__(self, settings: GenericDatabaseSettings | None = None) -> None:
+        """Initialise AlchemyDB from the given settings, creating the necessary table.
+
+        Args:
+            settings (GenericDatabaseSettings | None): Connection settings,
+            read from environment variables if not given.
+        """
+        self._load_settings(settings)
+        self._connect()
+
+    def _connect(self) -> None:
+        """Create the engine and table, once the settings have been loaded."""
         self.table_name: str = TABLE_NAME
         self.created_new_table: bool = False
-        self.dialect: str  # This attribute is given by sub-classes
+        # Result of `get_last`, cleared whenever this instance writes a row
+        self._last_cache: tuple[int, datetime, str] | None = None
         self.engine: db.Engine = self.create_engine()
         self.create_table()
 
-    def _load_settings(self, settings: GenericDatabaseSettings):
-        """Load MySQL/PostgreSQL configuration values from environment variables,
-        using `pydantic-settings` .
+    def _load_settings(self, settings: GenericDatabaseSettings | None = None):
+        """Load MySQL/PostgreSQL configuration values from the given settings,
+        or directly from environment variables if no settings are given.
 
         Raises:
             ConfigurationError: If any required setting is missing.
         """
+        if settings is None:
+            self._load_environment()
+            return
 
         self.username: str | None = settings.username
         self.password: str | None = settings.password
@@ -60,6 +192,28 @@ class AlchemyDB:
         ]:
             raise ConfigurationError(missing_env_var=", ".join(missing_settings))
 
+    def _load_environment(self):
+        """Load MySQL/PostgreSQL configuration values from environment variables.
+
+        Reads `os.environ` directly, avoiding the cost of building
+        `GenericDatabaseSettings` on every start.
+
+        Raises:
+            ConfigurationError: If any required setting is missing or invalid.
+        """
+        values = {k: environ.get(k) for k in _GENERIC_DB_REQUIRED_ENV}
+        if missing_settings := [k for k, v in values.items() if not v]:
+            raise ConfigurationError(missing_env_var=", ".join(missing_settings))
+
+        self.username = values[GENERIC_DB_USERNAME_ENV]
+        self.password = values[GENERIC_DB_PASSWORD_ENV]
+        self.host = values[GENERIC_DB_HOST_ENV]
+        self.database = values[GENERIC_DB_DATABASE_NAME_ENV]
+        try:
+            self.port = int(values[GENERIC_DB_PORT_ENV])  # type: ignore[arg-type]
+        except ValueError:
+            raise ConfigurationError(GENERIC_DB_PORT_ENV) from None
+
     def create_engine(self) -> db.Engine:
         """Create and return the SQLAlchemy engine.
 
@@ -75,8 +229,19 @@ class AlchemyDB:
             port=self.port,
             database=self.database,
         )
-        log.debug(f"SQLAlchemy {url=}")
-        return db.create_engine(url)
+        log.debug("SQLAlchemy url=%r", url)
+        return _get_engine(
+            url,
+            pool_size=2,
+            max_overflow=0,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+        )
+
+    def close(self) -> None:
+        """Close all pooled connections held by the database engine."""
+        log.debug("Disposing of database engine")
+        self.engine.dispose()
 
     def write_data(self, datetime: datetime, ip: IPv4Address | IPv6Address) -> int:
         """Write the IP information to the database.
@@ -88,57 +253,155 @@ class AlchemyDB:
         Returns:
             int: The ID of the newly inserted row.
         """
-        values = IPInfo(time=datetime, ip_address=str(ip))
+        values = {"time": datetime, "ip_address": _ip_to_str(ip)}
         log.info(f"Adding row to table '{self.table_name}' in '{self}'")
         return self.commit_row(values)
 
+    def write_many(
+        self, rows: list[tuple[datetime, IPv4Address | IPv6Address]]
+    ) -> list[int]:
+        """Write multiple rows of IP information to the database, in one transaction.
+
+        Rows are sent as batched multi-row inserts, where the dialect can return
+        the new IDs for them. Otherwise each row is inserted individually.
+
+        Args:
+            rows (list[tuple[datetime, IPv4Address | IPv6Address]]): The timestamp
+            and IP address of each row to be stored.
+
+        Returns:
+            list[int]: The IDs of the newly inserted rows, in the order given.
+        """
+        values = [{"time": time, "ip_address": _ip_to_str(ip)} for time, ip in rows]
+        log.info(f"Adding {len(values)} rows to table '{self.table_name}' in '{self}'")
+        with self.engine.begin() as connection:
+            if values and self.engine.dialect.insert_executemany_returning:
+                insert = db.insert(IPInfo.__table__).returning(
+                    IPInfo.ID, sort_by_parameter_order=True
+                )
+                new_row_IDs = list(connection.scalars(insert, values))
+            else:
+                new_row_IDs = [self._insert_row(connection, row) for row in values]
+        self._last_cache = None
+        log.info(f"Committed {len(new_row_IDs)} new rows to database")
+        return new_row_IDs
+
     def create_table(self):
-        """Create the database table, if it does not exist."""
-        if not db.inspect(self.engine).has_table(self.table_name):
+        """Create the database table, if it does not exist.
+
+        The table almost always exists, so it is probed with an empty query,
+        and the database schema is only inspected if that fails.
+        This is only done once per engine.
+        """
+        if self.engine in _TABLE_READY:
+            return
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(_TABLE_PROBE)
+        except (OperationalError, ProgrammingError):
+            # The probe also fails if the database is unreachable or busy,
+            # so only create the table if it is really missing
+            if db.inspect(self.engine).has_table(self.table_name):
+                raise
             log.info(f"Table '{self.table_name}' does not exist, creating")
             self.created_new_table = True
             Base.metadata.create_all(self.engine)
+        _TABLE_READY.add(self.engine)
+
+    def upgrade_table(self):
+        """Add any indexes missing from a table created by an older version.
+
+        This inspects the database schema, so it is only run when requested
+        with `IPGET_UPGRADE_DATABASE`, rather than on every start.
+        """
+        log.info(f"Checking indexes on table '{self.table_name}'")
+        _TIME_INDEX.create(self.engine, checkfirst=True)
 
-    def commit_row(self, values: IPInfo) -> int:
+    def commit_row(self, values: dict[str, Any]) -> int:
         """Commit the IP information to the database.
 
+        The row is written with a Core insert, skipping ORM object instrumentation.
+
         Args:
-            values (IPInfo): The IPInfo object to be committed.
+            values (dict[str, Any]): The column values to be committed.
 
         Returns:
             int: The ID of the newly inserted row.
         """
-        log.debug("Creating session")
-        with Session(self.engine) as session:
-            with session.begin():
-                log.debug("Session started, adding data")
-                session.add(values)
-                log.debug("Committing changes")
-                session.commit()
-            session.refresh(values)
-            new_row_ID = values.ID
-            log.info(f"Committed new row to database with ID {new_row_ID}")
+        log.debug("Beginning transaction")
+        with self.engine.begin() as connection:
+            log.debug("Transaction started, adding data")
+            new_row_ID = self._insert_row(connection, values)
+            log.debug("Committing changes")
+        self._last_cache = None
+        log.info(f"Committed new row to database with ID {new_row_ID}")
         return new_row_ID
 
-    def get_last(self) -> tuple[int, datetime, IPv4Address | IPv6Address] | None:
+    def _insert_row(self, connection: db.Connection, values: dict[str, Any]) -> int:
+        """Insert a row within the connection's transaction, returning its ID."""
+        insert = db.insert(IPInfo.__table__).values(values)
+        # Read the new ID back in the same round-trip where supported
+        if self.engine.dialect.insert_returning:
+            return connection.execute(insert.returning(IPInfo.ID)).scalar_one()
+        return connection.execute(insert).lastrowid
+
+    def get_last(self) -> tuple[int, datetime, str] | None:
         """Retrieve the most recent IP information from the database.
 
+        The IP address is returned as stored, it is not parsed into an
+        `IPv4Address`/`IPv6Address`.
+
+        The result is cached until this instance writes a new row.
+
         Returns:
-            tuple[int, datetime, IPv4Address | IPv6Address | None]: A tuple containing
-            the ID, timestamp, and IP address of the most recent entry, or
+            tuple[int, datetime, str] | None: A tuple containing the ID,
+            timestamp, and IP address of the most recent entry, or
             'None', if no entry is found.
         """
+        if self._last_cache is not None:
+            log.debug("Using cached most recent IP")
+            return self._last_cache
         log.debug("Retrieving most recent IP from database")
         with Session(self.engine) as session:
             with session.begin():
                 log.debug("Session started, fetching data")
-                q = db.select(IPInfo).order_by(IPInfo.time.desc()).limit(1)
-                result = session.scalars(q).first()
-                return (
-                    None
-                    if result is None
-                    else (result.ID, result.time, IPAddress(result.ip_address))
-                )
+                result = session.scalars(_LAST_ROW_QUERY).first()
+                if result is None:
+                    return None
+                self._last_cache = (result.ID, result.time, result.ip_address)
+                return self._last_cache
+
+    def _begin_write(self) -> AbstractContextManager[db.Connection]:
+        """Begin a transaction that reads and then writes the table.
+
+        Returns:
+            AbstractContextManager[Connection]: Commits the transaction on exit.
+        """
+        return self.engine.begin()
+
+    def write_and_get_previous(
+        self, datetime: datetime, ip: IPv4Address | IPv6Address
+    ) -> tuple[int, str | None]:
+        """Write the IP information and fetch the previously stored IP address,
+        within a single transaction.
+
+        Args:
+            datetime (dt.datetime): The timestamp the IP was retrieved.
+            ip (IPv4Address | IPv6Address): The IP address to be stored.
+
+        Returns:
+            tuple[int, str | None]: The ID of the newly
+            inserted row, and the most recent IP address stored before it, or
+            'None', if no entry was found.
+        """
+        log.info(f"Adding row to table '{self.table_name}' in '{self}'")
+        with self._begin_write() as connection:
+            previous = connection.scalars(_LAST_IP_QUERY).first()
+            values = {"time": datetime, "ip_address": _ip_to_str(ip)}
+            new_row_ID = self._insert_row(connection, values)
+        self._last_cache = None
+        log.info(f"Committed new row to database with ID {new_row_ID}")
+        return new_row_ID, previous
 
     def __str__(self) -> str:
         return f"{self.table_name} in {self.database} on {self.host}:{self.port}"
@@ -151,17 +414,21 @@ class SQLite(AlchemyDB):
     this means it is necessary to override inherited methods.
     """
 
+    dialect = "sqlite"
+
     def __init__(self, settings: SQLiteDatabaseSettings | None = None) -> None:
         """Initialize SQLite using valuse from config."""
-        self.dialect: str = "sqlite"
-        if not settings:
-            settings = SQLiteDatabaseSettings()
-        self._load_settings(settings)
-        super().__init__()
+        self._load_settings(settings or get_sqlite_settings())
+        self._connect()
 
     def _load_settings(self, settings: SQLiteDatabaseSettings):  # type: ignore[override]
-        """Load SQLite file path from environment variable."""
+        """Load SQLite file path and pragmas from environment variables."""
         self.database_path: Path = settings.database_file_path
+        self.pragmas: tuple[tuple[str, str], ...] = (
+            ("journal_mode", settings.journal_mode),
+            ("synchronous", settings.synchronous),
+            *SQLITE_PRAGMAS,
+        )
 
     def create_engine(self) -> db.Engine:
         """Create and return the SQLAlchemy engine for SQLite.
@@ -170,11 +437,33 @@ class SQLite(AlchemyDB):
             sqlalchemy.engine: The SQLAlchemy engine object.
         """
         log.debug("Creating database engine")
-        log.debug(f"CWD: {Path.cwd()}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("CWD: %s", Path.cwd())
         # url = f"{self.dialect}:///{self.database_path}"
-        url = URL.create(drivername=self.dialect, database=str(self.database_path))
-        log.debug(f"SQLAlchemy {url=}")
-        return db.create_engine(url)
+        url = URL.create(
+            drivername=self.dialect,
+            database=str(self.database_path),
+            # Allow pooled connections to be reused by other threads
+            query={"check_same_thread": "false"},
+        )
+        log.debug("SQLAlchemy url=%r", url)
+        return _get_engine(url, pragmas=self.pragmas)
+
+    @contextmanager
+    def _begin_write(self) -> Iterator[db.Connection]:
+        """Begin a transaction with `BEGIN IMMEDIATE`.
+
+        SQLite transactions are deferred by default, only taking the write lock
+        at the first write. Taking it up front stops another writer inserting
+        between reading the previous row and inserting the new one.
+
+        Yields:
+            Connection: The connection, committed on exit.
+        """
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            yield connection
+            connection.commit()
 
     def __str__(self) -> str:
         return f"{self.table_name} in {self.database_path}"
@@ -183,30 +472,53 @@ class SQLite(AlchemyDB):
 class MySQL(AlchemyDB):
     """Concrete class for interacting with a MySQL database."""
 
-    def __init__(self, settings: GenericDatabaseSettings | None = None) -> None:
-        """Initialize MySQL using valuse from config."""
-        self.dialect: str = "mysql+pymysql"
-        if not settings:
-            settings = GenericDatabaseSettings()
-        self._load_settings(settings)
-        super().__init__()
+    dialect = "mysql+pymysql"
 
 
 class PostgreSQL(AlchemyDB):
     """Concrete class for interacting with a PostgreSQL database."""
 
-    def __init__(self, settings: GenericDatabaseSettings | None = None) -> None:
-        """Initialize PostgreSQL using valuse from config."""
-        self.dialect = "postgresql+pg8000"
-        if not settings:
-            settings = GenericDatabaseSettings()
-        self._load_settings(settings)
-        super().__init__()
+    dialect = "postgresql+pg8000"
+
+    def write_and_get_previous(
+        self, datetime: datetime, ip: IPv4Address | IPv6Address
+    ) -> tuple[int, str | None]:
+        """Write the IP information and fetch the previously stored IP address,
+        using a single statement.
+
+        The previous row is selected in a CTE alongside the `INSERT ... RETURNING`,
+        both see the same snapshot, so the new row is never returned as previous.
+
+        Args:
+            datetime (dt.datetime): The timestamp the IP was retrieved.
+            ip (IPv4Address | IPv6Address): The IP address to be stored.
+
+        Returns:
+            tuple[int, str | None]: The ID of the newly
+            inserted row, and the most recent IP address stored before it, or
+            'None', if no entry was found.
+        """
+        log.info(f"Adding row to table '{self.table_name}' in '{self}'")
+        prev = _LAST_IP_QUERY.cte("prev")
+        ins = (
+            db.insert(IPInfo.__table__)
+            .values(time=datetime, ip_address=_ip_to_str(ip))
+            .returning(IPInfo.ID)
+            .cte("ins")
+        )
+        query = db.select(ins.c.ID, db.select(prev.c.ip_address).scalar_subquery())
+        with self.engine.begin() as connection:
+            new_row_ID, previous = connection.execute(query).one()
+        self._last_cache = None
+        log.info(f"Committed new row to database with ID {new_row_ID}")
+        return new_row_ID, previous
 
 
 def get_database(mode: str) -> AlchemyDB:
     """Get the database instance based on the provided mode.
 
+    Instances are cached, so repeated calls share one engine and connection pool.
+
     Args:
         mode (str): The mode of database.
         Defaults to `sqlite`.
@@ -218,17 +530,26 @@ def get_database(mode: str) -> AlchemyDB:
         ConfigurationError: If the provided database mode is not supported
         or if any required configuration setting is missing.
     """
-    log.debug(f"Requested database mode is '{mode.lower()}'")
+    mode = mode.lower()
+    log.debug("Requested database mode is '%s'", mode)
     try:
-        match mode.lower():
-            case "sqlite":
-                return SQLite()
-            case "mysql" | "mariadb":
-                return MySQL()
-            case "postgres" | "postgresql":
-                return PostgreSQL()
-            case _:
-                raise ConfigurationError("IPGET_DB_TYPE")
+        return _get_database(mode)
     except ConfigurationError as e:
         log.exception(e)
         raise e
+
+
+_DB_FACTORIES: dict[str, Callable[[], AlchemyDB]] = {
+    "sqlite": SQLite,
+    "mysql": MySQL,
+    "mariadb": MySQL,
+    "postgres": PostgreSQL,
+    "postgresql": PostgreSQL,
+}
+
+
+@cache
+def _get_database(mode: str) -> AlchemyDB:
+    if (factory := _DB_FACTORIES.get(mode)) is None:
+        raise ConfigurationError("IPGET_DB_TYPE")
+    return factory()
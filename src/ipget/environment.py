@@ -5,6 +5,7 @@
 # LoggerSettings
 LOG_LEVEL_ENV = "IPGET_LOG_LEVEL"
 LOG_FILE_PATH = "IPGET_LOG_FILE_PATH"
+LOG_STDOUT_ONLY_ENV = "IPGET_LOG_STDOUT_ONLY"
 # HealthcheckSettings
 HEALTHCHECK_SERVER_ENV = "IPGET_HEALTHCHECK_SERVER"
 HEALTHCHECK_UUID_ENV = "IPGET_HEALTHCHECK_UUID"
@@ -12,6 +13,8 @@ HEALTHCHECK_UUID_ENV = "IPGET_HEALTHCHECK_UUID"
 DISCORD_WEBHOOK_ENV = "IPGET_DISCORD_WEBHOOK"
 # SQLiteDatabaseSettings
 SQLITE_DATABASE_PATH_ENV = "IPGET_DATABASE"
+SQLITE_JOURNAL_MODE_ENV = "IPGET_SQLITE_JOURNAL_MODE"
+SQLITE_SYNCHRONOUS_ENV = "IPGET_SQLITE_SYNCHRONOUS"
 # GenericDatabaseSettings
 GENERIC_DB_USERNAME_ENV = "IPGET_USERNAME"
 GENERIC_DB_PASSWORD_ENV = "IPGET_PASSWORD"
@@ -20,6 +23,10 @@ GENERIC_DB_PORT_ENV = "IPGET_PORT"
 GENERIC_DB_DATABASE_NAME_ENV = "IPGET_DATABASE"
 # AppSettings
 DATABASE_TYPE_ENV = "IPGET_DB_TYPE"
+IP_CACHE_FILE_ENV = "IPGET_IP_CACHE_FILE"
+UPGRADE_DATABASE_ENV = "IPGET_UPGRADE_DATABASE"
 # URLSettings
 URL_LIST_ENV = "IPGET_URL_LIST"
+# Cached settings getters
+FAST_SETTINGS_ENV = "IPGET_FAST_SETTINGS"
 ###########################################################
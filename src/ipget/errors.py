@@ -1,11 +1,12 @@
-class ConfigurationError(KeyError):
+class ConfigurationError(Exception):
     """Exception raised for configuration errors.
 
     Attributes:
-        missing_env_var (str): The name of the missing environment variable.
+        env_var (str): The name of the missing environment variable.
     """
 
     def __init__(self, missing_env_var: str) -> None:
+        super().__init__(missing_env_var)
         self.env_var: str = missing_env_var
 
     def __str__(self) -> str:
@@ -1,17 +1,31 @@
 import logging
-import socket
-import urllib.request as req
-from http.client import HTTPResponse
-from urllib.error import HTTPError
 from urllib.parse import urlencode, urljoin
 from uuid import UUID, uuid4
 
+import urllib3
+from urllib3 import BaseHTTPResponse
+
 from ipget.environment import HEALTHCHECK_SERVER_ENV, HEALTHCHECK_UUID_ENV  # noqa: F401
 from ipget.errors import ConfigurationError
-from ipget.settings import HealthcheckSettings
+from ipget.settings import HealthcheckSettings, get_healthcheck_settings
 
 log = logging.getLogger(__name__)
 
+# Shared by all pings, so the connection to the server is kept alive between them
+_POOL = urllib3.PoolManager(
+    num_pools=2, maxsize=4, retries=urllib3.Retry(total=1, backoff_factor=0.1)
+)
+_FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+_VALID_PINGS = frozenset({"success", "start", "fail", "log"})
+# Path appended to the base url for each ping type, any other (exit code) is "/{code}"
+_URL_SUFFIX: dict[str | int, str] = {
+    "success": "",
+    "start": "/start",
+    "fail": "/fail",
+    "log": "/log",
+}
+
 
 class HealthCheck:
     """Class for interacting with the healthcheck.io service."""
@@ -24,7 +38,7 @@ class HealthCheck:
             environment variable is not set.
         """
         if not settings:
-            settings = HealthcheckSettings()
+            settings = get_healthcheck_settings()
 
         log.debug("Creating HealthCheck object using UUID")
         self._run_id: UUID = self.regen_uuid()
@@ -38,6 +52,7 @@ class HealthCheck:
         ]:
             raise ConfigurationError(missing_env_var=", ".join(missing_settings))
 
+        self._base_url: str = self._get_base_url()
         self._url: str = ""
 
     def get_rid(self) -> UUID:
@@ -55,6 +70,7 @@ class HealthCheck:
             UUID: The newly generated UUID representing the updated run ID.
         """
         self._run_id = uuid4()
+        self._rid_query: str = urlencode({"rid": self._run_id})
         return self._run_id
 
     def _get_base_url(self) -> str:
@@ -64,7 +80,7 @@ class HealthCheck:
             str: Base URL to ping healthchecks.
         """
         base_url = urljoin(self._server, self._check_uuid)
-        log.debug(f"Base url: {base_url}")
+        log.debug("Base url: %s", base_url)
         return base_url
 
     def _get_ping_url(self, ping_type: str | int) -> str:
@@ -73,18 +89,11 @@ class HealthCheck:
         Returns:
             str: URL to ping healthcheck.
         """
-        valid_ping_types = ["success", "start", "fail", "log"]
-        if isinstance(ping_type, str) and ping_type not in valid_ping_types:
-            raise ValueError(f"Ping type should be one of {valid_ping_types}")
-        else:
-            ping_type = str(ping_type)
-        base = self._get_base_url()
-        query = urlencode({"rid": self.get_rid()})
-        if ping_type.lower() == "success":
-            self._url = f"{base}?{query}"
-        else:
-            self._url = f"{base}/{ping_type}?{query}"
-        log.debug(f"Pinging: {self._url}")
+        if isinstance(ping_type, str) and ping_type not in _VALID_PINGS:
+            raise ValueError(f"Ping type should be one of {sorted(_VALID_PINGS)}")
+        suffix = _URL_SUFFIX.get(ping_type, f"/{ping_type}")
+        self._url = f"{self._base_url}{suffix}?{self._rid_query}"
+        log.debug("Pinging: %s", self._url)
         return self._url
 
     @staticmethod
@@ -102,33 +111,43 @@ class HealthCheck:
         timeout: int = 10,
         ping_type: str | int = "success",
         post_data: bytes | dict | None = None,
-    ) -> HTTPResponse | HTTPError | None:
+    ) -> BaseHTTPResponse | None:
         """Sends the healthcheck ping.
 
         Args:
-            timeout (int, optional): urlopen() timeout. Defaults to 10.
+            timeout (int, optional): Request timeout. Defaults to 10.
             ping_type (str | int, optional): Type of ping to send.
             Defaults to "success".
             Valid strings: ["success", "start", "fail", "log"]
             post_data (bytes | dict | None, optional): _description_. Defaults to None.
 
         Returns:
-            HTTPResponse | HTTPError | None: _description_
+            BaseHTTPResponse | None: The response, or None if the ping failed.
         """
         url = self._get_ping_url(ping_type)
+        body = self._encode_payload_data(post_data)
         try:
-            return req.urlopen(
+            response = _POOL.request(
+                "GET" if body is None else "POST",
                 url,
+                body=body,
+                headers=None if body is None else _FORM_HEADERS,
                 timeout=timeout,
-                data=self._encode_payload_data(post_data),
             )
-        except (HTTPError, socket.error) as e:
+        except urllib3.exceptions.HTTPError as e:
             log.exception(f"Ping to '{url}' of type: {ping_type} failed:\n{e}")
             return None
+        if response.status >= 400:
+            log.error(
+                f"Ping to '{url}' of type: {ping_type} failed:\n"
+                f"{response.status} {response.reason}"
+            )
+            return None
+        return response
 
     def success(
         self, payload: bytes | dict | None = None, timeout: int = 10
-    ) -> HTTPResponse | HTTPError | None:
+    ) -> BaseHTTPResponse | None:
         """Send a 'Success' ping to the health check server.
 
         Args:
@@ -138,14 +157,14 @@ class HealthCheck:
             timeout (int): The timeout value for the request in seconds.
 
         Returns:
-            HTTPResponse | HTTPError | None: Response object received from the request.
+            BaseHTTPResponse | None: Response object received from the request.
         """
         log.info("Sending 'success' ping")
         return self._request(ping_type="success", timeout=timeout, post_data=payload)
 
     def start(
         self, payload: bytes | dict | None = None, timeout: int = 10
-    ) -> HTTPResponse | HTTPError | None:
+    ) -> BaseHTTPResponse | None:
         """Send a 'Start' ping to the health check server.
 
         Args:
@@ -155,14 +174,14 @@ class HealthCheck:
             timeout (int): The timeout value for the request in seconds.
 
         Returns:
-            HTTPResponse | HTTPError | None: Response object received from the request.
+            BaseHTTPResponse | None: Response object received from the request.
         """
         log.info("Sending 'start' ping")
         return self._request(ping_type="start", timeout=timeout, post_data=payload)
 
     def fail(
         self, payload: bytes | dict | None = None, timeout: int = 10
-    ) -> HTTPResponse | HTTPError | None:
+    ) -> BaseHTTPResponse | None:
         """Send a 'Fail' ping to the health check server.
 
         Args:
@@ -172,7 +191,7 @@ class HealthCheck:
             timeout (int): The timeout value for the request in seconds.
 
         Returns:
-            HTTPResponse | HTTPError | None: Response object received from the request.
+            BaseHTTPResponse | None: Response object received from the request.
         """
         log.info("Sending 'fail' ping")
         return self._request(ping_type="fail", timeout=timeout, post_data=payload)
@@ -182,7 +201,7 @@ class HealthCheck:
         payload: bytes | dict | None = None,
         timeout: int = 10,
         ping_body_limit: int = 100,
-    ) -> HTTPResponse | HTTPError | None:
+    ) -> BaseHTTPResponse | None:
         """NOT IMPLEMENTED: Send a 'Log' ping to the health check server.
 
         Args:
@@ -191,14 +210,14 @@ class HealthCheck:
             ping_body_limit (int): The maximum limit for the ping body size in bytes.
 
         Returns:
-            HTTPResponse | HTTPError | None: Response object received from the request.
+            BaseHTTPResponse | None: Response object received from the request.
         """
         log.info("Sending 'log' ping, check status will not change")
         raise NotImplementedError
 
     def returncode(
         self, returncode: int, payload: bytes | dict | None = None, timeout: int = 10
-    ) -> HTTPResponse | HTTPError | None:
+    ) -> BaseHTTPResponse | None:
         """Send a ping reporting the script's exit status to the health check server.
 
         Args:
@@ -208,7 +227,7 @@ class HealthCheck:
             timeout (int): The timeout value for the request in seconds.
 
         Returns:
-            HTTPResponse | HTTPError | None: Response object received from the request.
+            BaseHTTPResponse | None: Response object received from the request.
         """
         log.info(f"Sending returncode ping: {returncode}")
         return self._request(ping_type=returncode, timeout=timeout, post_data=payload)
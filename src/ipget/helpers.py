@@ -20,11 +20,10 @@ def custom_namer(name: str) -> str:
     """
     if not isinstance(name, str):
         raise TypeError(name)
-    name_path = Path(name).resolve()
-    stem = str(name_path.stem).replace(".log", "")
-    if not all([stem, name_path.suffix]):
+    # The handler always passes an absolute path, so it is not resolved again
+    name_path = Path(name)
+    stem = name_path.stem.replace(".log", "")
+    if not (stem and name_path.suffix):
         raise ValueError(name)
-    log_dir = name_path.parent
-    date = str(datetime.datetime.now().date())
-    # return str(log_dir.joinpath(f"ipget.{date}.log"))
-    return str(log_dir.joinpath(f"{stem}.{date}.log"))
+    date = datetime.datetime.now().date()
+    return str(name_path.with_name(f"{stem}.{date}.log"))
@@ -1,19 +1,40 @@
 import logging
-import urllib.error
-import urllib.request
+import os
+import threading
+from datetime import datetime
+from functools import cache
 from ipaddress import IPv4Address, IPv6Address, ip_address
-from typing import Literal
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import TYPE_CHECKING
 
+import requests
 from pydantic import HttpUrl
+from requests.adapters import HTTPAdapter
 
-from ipget.alchemy import AlchemyDB
 from ipget.errors import IPRetrievalError
 from ipget.settings import URLSettings
 
+if TYPE_CHECKING:
+    from ipget.alchemy import AlchemyDB
+
 log = logging.getLogger(__name__)
 
+# Seconds a lookup is given before the next URL is also queried
+_HEDGE_DELAY = 0.5
+
+
+@cache
+def _get_session() -> requests.Session:
+    """Returns the HTTP session shared by all IP lookups in this process,
+    so connections (and TLS sessions) are reused rather than re-established.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
 
-def get_ip_from_url(url: str) -> IPv4Address | IPv6Address | None:
+def get_ip_from_url(url: str, timeout: int = 10) -> IPv4Address | IPv6Address | None:
     """
     Returns the current public IP address.
 
@@ -25,9 +46,10 @@ def get_ip_from_url(url: str) -> IPv4Address | IPv6Address | None:
     """
     log.debug(f"Retrieving current IP from {url}")
     try:
-        ip_str = urllib.request.urlopen(url).read().decode("utf8")
-        return ip_address(ip_str)
-    except urllib.error.URLError:
+        response = _get_session().get(url, timeout=timeout)
+        response.raise_for_status()
+        return ip_address(response.text)
+    except (requests.RequestException, ValueError):
         log.warning(
             f"Failed to retrieve IP address from {url}",
             exc_info=log.level == logging.DEBUG,
@@ -35,10 +57,21 @@ def get_ip_from_url(url: str) -> IPv4Address | IPv6Address | None:
     return None
 
 
+@cache
+def _cached_urls() -> tuple[str, ...]:
+    """Returns the configured IP lookup URLs, validated once per process."""
+    http_urls: list[HttpUrl] = URLSettings().urls
+    return tuple(str(url) for url in http_urls)
+
+
 def get_current_ip() -> IPv4Address | IPv6Address:
     """
     Retrieves the current IP address from a list of URLs.
 
+    The URLs are tried in order, the next one is also queried if the previous
+    fails or has not answered within `_HEDGE_DELAY` seconds. The first IP address
+    returned is used.
+
     Returns:
         The current IP address as an instance of either IPv4Address or IPv6Address.
 
@@ -46,42 +79,99 @@ def get_current_ip() -> IPv4Address | IPv6Address:
         Exception: If the current IP address cannot be retrieved from any source.
     """
     # TODO: Make list of URLs a configuration option
-    config = URLSettings()
-    http_urls: list[HttpUrl] = config.urls
-    urls: list[str] = [str(url) for url in http_urls]
+    urls = _cached_urls()
+    results: SimpleQueue[IPv4Address | IPv6Address | None] = SimpleQueue()
+
+    def lookup(url: str) -> None:
+        results.put(get_ip_from_url(url))
+
+    pending = 0
     for url in urls:
-        current_ip = get_ip_from_url(url)
+        # Daemon threads, so a slow source left running does not delay exiting
+        threading.Thread(target=lookup, args=(url,), daemon=True).start()
+        pending += 1
+        try:
+            current_ip = results.get(timeout=_HEDGE_DELAY)
+        except Empty:
+            continue
+        pending -= 1
+        if current_ip:
+            log.info(f"Current IP: {current_ip}")
+            return current_ip
+    while pending:
+        current_ip = results.get()
+        pending -= 1
         if current_ip:
             log.info(f"Current IP: {current_ip}")
             return current_ip
-    raise IPRetrievalError(urls)
+    raise IPRetrievalError(list(urls))
 
 
-def get_previous_ip(
-    db: AlchemyDB,
-) -> IPv4Address | IPv6Address | Literal["Unknown"] | None:
+def write_current_ip(
+    db: "AlchemyDB",
+    time: datetime,
+    current_ip: IPv4Address | IPv6Address,
+) -> str | None:
     """
-    Returns the previous public IP address.
+    Writes the current public IP address, returning the previous one.
+
+    The previous IP is fetched as part of the write, rather than as a separate query.
 
     Args:
-        db (AlchemyDB): The database object used to retrieve the previous IP address.
+        db (AlchemyDB): The database object used to store the IP address.
+        time (datetime): The timestamp the current IP was retrieved.
+        current_ip (IPv4Address | IPv6Address): The current IP address.
 
     Returns:
-        IPv4Address | IPv6Address | Literal["Unknown"] | None: The previous IP address,
+        str | None: The previous IP address,
         if available, "Unknown" if the database was just created, or None
         if there was an error retrieving the previous IP address.
     """
-    log.debug("Retrieving previous IP from database")
+    _, previous_ip = db.write_and_get_previous(time, current_ip)
 
     # If the database was only just created, there is no previous IP
     if db.created_new_table:
         log.warning("First run on new database, previous IP is unknown")
         return "Unknown"
 
-    last = db.get_last()
-    previous_ip = last[2] if last else None
+    return _log_previous_ip(previous_ip)
+
+
+def _log_previous_ip(previous_ip: str | None) -> str | None:
     if previous_ip:
         log.info(f"Previous IP: {previous_ip}")
     else:
         log.warning("Error retrieving previous IP address")
     return previous_ip
+
+
+def read_cached_ip(path: Path) -> str | None:
+    """
+    Returns the IP address last written to the local cache file.
+
+    Args:
+        path (Path): Location of the cache file.
+
+    Returns:
+        str | None: The cached IP address, or None if the file is missing or empty.
+    """
+    try:
+        return path.read_text(encoding="utf8").strip() or None
+    except OSError:
+        log.debug(f"No cached IP address in '{path}'")
+        return None
+
+
+def write_cached_ip(path: Path, ip: IPv4Address | IPv6Address) -> None:
+    """
+    Writes the IP address to the local cache file.
+
+    The file is replaced atomically, so it is never left partially written.
+
+    Args:
+        path (Path): Location of the cache file.
+        ip (IPv4Address | IPv6Address): The IP address to cache.
+    """
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_text(str(ip), encoding="utf8")
+    os.replace(temp_path, path)
@@ -1,17 +1,143 @@
 import logging
+import threading
+import time
+from functools import cache
 from http.client import responses
 from ipaddress import IPv4Address, IPv6Address
-from typing import Literal
+from typing import TYPE_CHECKING
 
-from discord_webhook import DiscordWebhook
-from requests import Response
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import BaseHTTPResponse, Retry
 
 from ipget.environment import DISCORD_WEBHOOK_ENV
 from ipget.errors import ConfigurationError
-from ipget.settings import NotificationSettings
+from ipget.settings import NotificationSettings, get_notification_settings
+
+if TYPE_CHECKING:
+    from discord_webhook import DiscordWebhook
+    from requests import Response
 
 log = logging.getLogger(__name__)
 
+# Queued messages are sent together once this many are waiting, or if the last
+# send was longer than the interval (seconds) ago
+BATCH_MAX = 10
+BATCH_INTERVAL = 2.0
+# Discord's maximum message length
+MESSAGE_LIMIT = 2000
+_BATCH_SEPARATOR = "\n---\n"
+
+_SUCCESS_TEMPLATE = "**Public ip address has changed!**\nPrevious: {prev}\nNew: {curr}"
+_NO_PREVIOUS_TEMPLATE = "Error retrieving previous IP address\nCurrent IP: {curr}"
+_ERROR_HEADER = "**Encountered Errors:**\n"
+
+# Longest wait (seconds) accepted from a Retry-After header
+RETRY_AFTER_MAX = 30.0
+
+
+class _CappedRetry(Retry):
+    """A `Retry` that waits as long as Retry-After asks, up to `RETRY_AFTER_MAX`."""
+
+    def get_retry_after(self, response: BaseHTTPResponse) -> float | None:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_AFTER_MAX)
+
+
+# Rate limited responses are retried by the connection pool, after the time given
+# by Discord. Other errors are not retried, as the message may already have been
+# posted. The last response is returned as is.
+_RETRY = _CappedRetry(
+    total=3,
+    backoff_factor=0.25,
+    backoff_max=0.5,
+    status_forcelist=(429,),
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+
+def _batch_messages(messages: list[str]) -> list[str]:
+    """Join messages into as few payloads as fit within Discord's length limit.
+
+    Args:
+        messages (list[str]): The messages to join, any longer than the limit
+        are truncated.
+
+    Returns:
+        list[str]: The message payloads to send.
+    """
+    payloads: list[str] = []
+    for message in messages:
+        message = message[:MESSAGE_LIMIT]
+        if payloads and (
+            len(payloads[-1]) + len(_BATCH_SEPARATOR) + len(message) <= MESSAGE_LIMIT
+        ):
+            payloads[-1] += _BATCH_SEPARATOR + message
+        else:
+            payloads.append(message)
+    return payloads
+
+
+def _render_errors(errors: list[Exception]) -> str:
+    """Render errors one per line, stopping once the message is too long to send.
+
+    Args:
+        errors (list[Exception]): The errors to render.
+
+    Returns:
+        str: The error message, which may still exceed the length limit.
+    """
+    lines: list[str] = []
+    length = len(_ERROR_HEADER)
+    for error in errors:
+        if length >= MESSAGE_LIMIT:
+            break
+        line = str(error)
+        lines.append(line)
+        length += len(line) + 1
+    return _ERROR_HEADER + "\n".join(lines)
+
+
+@cache
+def _session_webhook() -> type["DiscordWebhook"]:
+    """Define the webhook class on first use, so discord_webhook is only
+    imported when notifications are enabled.
+    """
+    from discord_webhook import DiscordWebhook
+
+    class _SessionWebhook(DiscordWebhook):
+        """A `DiscordWebhook` that posts through a shared `requests.Session`,
+        so the connection to Discord is reused between messages.
+        """
+
+        def __init__(self, url: str, session: requests.Session, **kwargs) -> None:
+            super().__init__(url, **kwargs)
+            self.session = session
+
+        @property
+        def json(self) -> dict:
+            # Every instance attribute is serialised into the payload, including
+            # the session and the id and attachments of the previous response
+            data = super().json
+            for key in ("session", "id", "attachments"):
+                data.pop(key, None)
+            return data
+
+        def api_post_request(self) -> "Response":
+            if self.files:
+                return super().api_post_request()
+            return self.session.post(
+                self.url,
+                json=self.json,
+                params=self._query_params,
+                proxies=self.proxies,
+                timeout=self.timeout,
+            )
+
+    return _SessionWebhook
+
 
 class Discord:
     """Class for sending notifications to Discord."""
@@ -24,14 +150,37 @@ class Discord:
             environment variable is not set.
         """
         if not settings:
-            settings = NotificationSettings()
+            settings = get_notification_settings()
 
         if settings.discord_webhook:
             self.webhook_url = settings.discord_webhook
         else:
             raise ConfigurationError(DISCORD_WEBHOOK_ENV)
 
-    def _send_basic_message(self, message: str) -> Response:
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": "ipget"})
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=_RETRY),
+        )
+        self._webhook = _session_webhook()(
+            url=self.webhook_url,
+            session=self._session,
+            rate_limit_retry=False,
+            timeout=3,
+            # avatar_url="/app/assets/avatar.jpg"
+        )
+        # Messages may be sent from a background thread, they share the webhook
+        self._webhook_lock = threading.Lock()
+        self._queue: list[str] = []
+        self._queue_lock = threading.Lock()
+        self._last_flush: float = float("-inf")
+
+    def close(self) -> None:
+        """Close the HTTP session used to send messages."""
+        self._session.close()
+
+    def _send_basic_message(self, message: str) -> "Response":
         """Send a basic (non-embed) message to the Discord webhook.
 
         Args:
@@ -40,43 +189,72 @@ class Discord:
         Returns:
             Response: The response object received after executing the webhook.
         """
-        self._webhook = DiscordWebhook(
-            url=self.webhook_url,
-            content=message,
-            rate_limit_retry=True,
-            # avatar_url="/app/assets/avatar.jpg"
-        )
-        response = self._webhook.execute()
-        log.debug(
-            f"Response: {response.status_code} {responses.get(response.status_code)}"
-        )
+        with self._webhook_lock:
+            self._webhook.content = message
+            response = self._webhook.execute(remove_embeds=True)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Response: %s %s",
+                response.status_code,
+                responses.get(response.status_code),
+            )
         return response
 
+    def enqueue(self, message: str) -> int | None:
+        """Queue a message, sending the queue if it is full or has not been
+        sent recently.
+
+        Args:
+            message (str): The message content to be sent.
+
+        Returns:
+            int | None: The status code of the last webhook response,
+            or None if the message is still queued.
+        """
+        with self._queue_lock:
+            self._queue.append(message)
+            due = (
+                len(self._queue) >= BATCH_MAX
+                or time.monotonic() - self._last_flush > BATCH_INTERVAL
+            )
+        return self.flush() if due else None
+
+    def flush(self) -> int | None:
+        """Send all queued messages, batched into as few webhook calls as possible.
+
+        Returns:
+            int | None: The status code of the last webhook response,
+            or None if there were no queued messages.
+        """
+        with self._queue_lock:
+            messages, self._queue = self._queue, []
+            self._last_flush = time.monotonic()
+        status_code = None
+        for payload in _batch_messages(messages):
+            status_code = self._send_basic_message(payload).status_code
+        return status_code
+
     def notify_success(
         self,
-        previous_ip: IPv4Address | IPv6Address | Literal["Unknown"] | None,
+        previous_ip: IPv4Address | IPv6Address | str | None,
         current_ip: IPv4Address | IPv6Address,
-    ) -> int:
+    ) -> int | None:
         """Send a notification to the Discord webhook, if the public IP has changed.
 
         Args:
-            previous_ip (IPv4Address | IPv6Address | "Unknown"): Previous IP address.
+            previous_ip (IPv4Address | IPv6Address | str): Previous IP address.
             current_ip (IPv4Address | IPv6Address): Current IP address value.
 
         Returns:
-            Response: The response object received after executing the webhook.
+            int | None: The status code of the webhook response,
+            or None if the message was queued.
         """
         log.debug("Sending message to Discord webhook")
-        error = f"Error retrieving previous IP address\nCurrent IP: {current_ip}"
-        success = (
-            "**Public ip address has changed!**\n"
-            f"Previous: {previous_ip}\n"
-            f"New: {current_ip}"
-        )
-        message = success if previous_ip else error
-        return self._send_basic_message(message).status_code
+        template = _SUCCESS_TEMPLATE if previous_ip else _NO_PREVIOUS_TEMPLATE
+        message = template.format_map({"prev": previous_ip, "curr": current_ip})
+        return self.enqueue(message)
 
-    def notify_error(self, errors: list[Exception]) -> int:
+    def notify_error(self, errors: list[Exception]) -> int | None:
         """Send an error notification to the Discord webhook.
 
         Args:
@@ -84,11 +262,11 @@ class Discord:
             representing the encountered errors.
 
         Returns:
-            Response: The response object received after executing the webhook.
+            int | None: The status code of the webhook response,
+            or None if the message was queued.
         """
         log.debug("Sending errors to Discord webhook")
-        message = "**Encountered Errors:**\n" + "\n".join(str(e) for e in errors)
-        return self._send_basic_message(message).status_code
+        return self.enqueue(_render_errors(errors))
 
 
 def get_discord() -> Discord | None:
@@ -1,6 +1,8 @@
 import logging
+import os
+from functools import cache
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import Field, HttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -8,6 +10,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from ipget.environment import (
     DATABASE_TYPE_ENV,
     DISCORD_WEBHOOK_ENV,
+    FAST_SETTINGS_ENV,
     GENERIC_DB_DATABASE_NAME_ENV,
     GENERIC_DB_HOST_ENV,
     GENERIC_DB_PASSWORD_ENV,
@@ -15,15 +18,22 @@ from ipget.environment import (
     GENERIC_DB_USERNAME_ENV,
     HEALTHCHECK_SERVER_ENV,
     HEALTHCHECK_UUID_ENV,
+    IP_CACHE_FILE_ENV,
     LOG_FILE_PATH,
     LOG_LEVEL_ENV,
+    LOG_STDOUT_ONLY_ENV,
     SQLITE_DATABASE_PATH_ENV,
+    SQLITE_JOURNAL_MODE_ENV,
+    SQLITE_SYNCHRONOUS_ENV,
+    UPGRADE_DATABASE_ENV,
 )
 
 log = logging.getLogger(__name__)
 
 LOG_LEVELS = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 DATABASE_TYPES = Literal["sqlite", "mysql", "mariadb", "postgres", "postgresql"]
+SQLITE_JOURNAL_MODES = Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+SQLITE_SYNCHRONOUS_MODES = Literal["OFF", "NORMAL", "FULL", "EXTRA"]
 
 
 class ConfiguredBaseSettings(BaseSettings):
@@ -33,7 +43,7 @@ class ConfiguredBaseSettings(BaseSettings):
         env_prefix="IPGET_",
         populate_by_name=True,
         # Disabled due to issues when building container, implement later.
-        # secrets_dir="/run/secrets" if platform.system() == "Linux" else None,
+        # secrets_dir="/run/secrets" if sys.platform == "linux" else None,
     )
 
 
@@ -50,6 +60,11 @@ class LoggerSettings(ConfiguredBaseSettings):
         serialization_alias=LOG_FILE_PATH,
         validation_alias=LOG_FILE_PATH,
     )
+    stdout_only: bool = Field(
+        default=False,
+        serialization_alias=LOG_STDOUT_ONLY_ENV,
+        validation_alias=LOG_STDOUT_ONLY_ENV,
+    )
 
     @field_validator("level", mode="before")
     @classmethod
@@ -99,6 +114,21 @@ class SQLiteDatabaseSettings(ConfiguredBaseSettings):
         serialization_alias=SQLITE_DATABASE_PATH_ENV,
         validation_alias=SQLITE_DATABASE_PATH_ENV,
     )
+    journal_mode: SQLITE_JOURNAL_MODES = Field(
+        default="WAL",
+        serialization_alias=SQLITE_JOURNAL_MODE_ENV,
+        validation_alias=SQLITE_JOURNAL_MODE_ENV,
+    )
+    synchronous: SQLITE_SYNCHRONOUS_MODES = Field(
+        default="NORMAL",
+        serialization_alias=SQLITE_SYNCHRONOUS_ENV,
+        validation_alias=SQLITE_SYNCHRONOUS_ENV,
+    )
+
+    @field_validator("journal_mode", "synchronous", mode="before")
+    @classmethod
+    def convert_to_upper(cls, v):
+        return v.upper() if isinstance(v, str) else v
 
 
 class GenericDatabaseSettings(ConfiguredBaseSettings):
@@ -139,6 +169,9 @@ class AppSettings(ConfiguredBaseSettings):
 
     Attributes:
         db_type (str): Type of the database.
+        ip_cache_file (Path | None): File used to cache the last written IP address.
+        upgrade_database (bool): Whether to bring an existing table's indexes
+        up to date before writing.
     """
 
     db_type: DATABASE_TYPES = Field(
@@ -146,6 +179,16 @@ class AppSettings(ConfiguredBaseSettings):
         serialization_alias=DATABASE_TYPE_ENV,
         validation_alias=DATABASE_TYPE_ENV,
     )
+    ip_cache_file: Path | None = Field(
+        default=None,
+        serialization_alias=IP_CACHE_FILE_ENV,
+        validation_alias=IP_CACHE_FILE_ENV,
+    )
+    upgrade_database: bool = Field(
+        default=False,
+        serialization_alias=UPGRADE_DATABASE_ENV,
+        validation_alias=UPGRADE_DATABASE_ENV,
+    )
 
     @field_validator("db_type", mode="before")
     @classmethod
@@ -168,3 +211,66 @@ class URLSettings(ConfiguredBaseSettings):
         serialization_alias="IPGET_URL_LIST",
         validation_alias="IPGET_URL_LIST",
     )
+
+
+# Settings read from the environment are cached, so each is only validated once.
+# Tests changing the environment must call `clear_settings_cache()` afterwards.
+@cache
+def get_logger_settings() -> LoggerSettings:
+    return LoggerSettings()
+
+
+def _fast_settings() -> bool:
+    """Whether settings may skip validation, see `IPGET_FAST_SETTINGS`."""
+    return os.environ.get(FAST_SETTINGS_ENV, "").lower() in ("1", "true")
+
+
+def _from_environment(**fields: str) -> dict[str, Any]:
+    """Map field names to the values of their environment variables,
+    omitting any that are not set.
+    """
+    return {
+        field: os.environ[name] for field, name in fields.items() if name in os.environ
+    }
+
+
+@cache
+def get_healthcheck_settings() -> HealthcheckSettings:
+    if _fast_settings():
+        return HealthcheckSettings.model_construct(
+            **_from_environment(
+                server=HEALTHCHECK_SERVER_ENV, uuid=HEALTHCHECK_UUID_ENV
+            )
+        )
+    return HealthcheckSettings()
+
+
+@cache
+def get_notification_settings() -> NotificationSettings:
+    if _fast_settings():
+        return NotificationSettings.model_construct(
+            **_from_environment(discord_webhook=DISCORD_WEBHOOK_ENV)
+        )
+    return NotificationSettings()
+
+
+@cache
+def get_sqlite_settings() -> SQLiteDatabaseSettings:
+    return SQLiteDatabaseSettings()
+
+
+@cache
+def get_app_settings() -> AppSettings:
+    return AppSettings()
+
+
+def clear_settings_cache() -> None:
+    """Clear the cached settings, so they are read from the environment again."""
+    for getter in (
+        get_logger_settings,
+        get_healthcheck_settings,
+        get_notification_settings,
+        get_sqlite_settings,
+        get_app_settings,
+    ):
+        getter.cache_clear()
@@ -1,16 +1,17 @@
-import urllib.request as req
 from datetime import datetime, timezone
 from ipaddress import IPv4Address
-from os import environ
+from os import environ, urandom
 from pathlib import Path
-from random import randint
 
+import hypothesis
 import pytest
 from discord_webhook import DiscordWebhook
 from dotenv import load_dotenv
 from pytest import MonkeyPatch
+from sqlalchemy import delete
 
-from ipget.alchemy import SQLite
+from ipget import healthchecks
+from ipget.alchemy import IPInfo, SQLite
 from ipget.healthchecks import HealthCheck
 from ipget.settings import (
     DISCORD_WEBHOOK_ENV,
@@ -21,23 +22,52 @@ from ipget.settings import (
     HealthcheckSettings,
     NotificationSettings,
     SQLiteDatabaseSettings,
+    clear_settings_cache,
 )
 
 load_dotenv(".env.test", verbose=True, override=True)
 
+# The properties tested are simple, so a few derandomized examples are enough.
+# Use HYPOTHESIS_PROFILE=thorough for a wider search.
+hypothesis.settings.register_profile(
+    "fast",
+    max_examples=25,
+    derandomize=True,
+    database=None,
+    suppress_health_check=[hypothesis.HealthCheck.too_slow],
+)
+hypothesis.settings.register_profile("thorough", max_examples=500)
+hypothesis.settings.load_profile(environ.get("HYPOTHESIS_PROFILE", "fast"))
+
+# Snapshot of the test-only variables, taken after .env.test has been loaded
+_TEST_ENV = {k: v for k, v in environ.items() if k.startswith("IPGET_TEST_")}
+
+
+@pytest.fixture(autouse=True)
+def clear_cached_settings():
+    """Settings are cached per process, so each test reads its own environment."""
+    clear_settings_cache()
+    yield
+    clear_settings_cache()
+
 
 class FakeResponse:
     def __init__(self, status_code: int) -> None:
         self.status_code: int = status_code
+        self.status: int = status_code
 
     def getcode(self):
         return self.status_code
 
 
+# Responses are never modified, so every mocked request can return the same one
+_OK_RESPONSE = FakeResponse(200)
+
+
 @pytest.fixture
 def mock_discord_with_response(monkeypatch: MonkeyPatch):
     def response_200(*args, **kwargs):
-        return FakeResponse(200)
+        return _OK_RESPONSE
 
     monkeypatch.setenv(DISCORD_WEBHOOK_ENV, "https://test.example.com")
     monkeypatch.setattr(DiscordWebhook, "execute", response_200)
@@ -51,12 +81,11 @@ def ip_data_static() -> tuple[datetime, IPv4Address]:
 def generate_random_ipv4_address() -> IPv4Address:
     """Returns a completely random ipaddress.IPv4Address
 
-    Uses, random.randint() to generate a random integer within
-    the valid range of IPv4 addresses (from 0 to 2^32 - 1).
-    This is then converted to an IPv4Address object using ipaddress.IPv4Address()
+    Uses os.urandom() to generate 4 random bytes, covering the valid range
+    of IPv4 addresses (from 0.0.0.0 to 255.255.255.255).
+    These are passed directly to ipaddress.IPv4Address() as a packed address.
     """
-    ip_int = randint(0, 2**32 - 1)
-    return IPv4Address(ip_int)
+    return IPv4Address(urandom(4))
 
 
 @pytest.fixture
@@ -73,23 +102,35 @@ def env_valid_app_settings() -> AppSettings:
 
 @pytest.fixture(scope="function")
 def env_test_sqlite_settings() -> SQLiteDatabaseSettings:
-    db_name = environ.get("IPGET_TEST_SQLITE_DATABASE") or ":memory:"
+    db_name = _TEST_ENV.get("IPGET_TEST_SQLITE_DATABASE") or ":memory:"
     return SQLiteDatabaseSettings(database_file_path=Path(db_name))
 
 
-@pytest.fixture
-def sqlite_in_memory():
+@pytest.fixture(scope="session")
+def _sqlite_session_db() -> SQLite:
     return SQLite(SQLiteDatabaseSettings(database_file_path=Path(":memory:")))
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture
+def sqlite_in_memory(_sqlite_session_db: SQLite):
+    """An in-memory database shared by the whole session, emptied after each test.
+
+    Tests using it must not change the schema.
+    """
+    yield _sqlite_session_db
+    with _sqlite_session_db.engine.begin() as connection:
+        connection.execute(delete(IPInfo))
+    _sqlite_session_db._last_cache = None
+
+
+@pytest.fixture(scope="session")
 def env_testing_mysql_settings() -> GenericDatabaseSettings:
-    test_user = environ.get("IPGET_TEST_MYSQL_USERNAME")
-    test_password = environ.get("IPGET_TEST_MYSQL_PASSWORD")
-    test_host = environ.get("IPGET_TEST_MYSQL_HOST")
-    port = environ.get("IPGET_TEST_MYSQL_PORT")
+    test_user = _TEST_ENV.get("IPGET_TEST_MYSQL_USERNAME")
+    test_password = _TEST_ENV.get("IPGET_TEST_MYSQL_PASSWORD")
+    test_host = _TEST_ENV.get("IPGET_TEST_MYSQL_HOST")
+    port = _TEST_ENV.get("IPGET_TEST_MYSQL_PORT")
     test_port = int(port) if port else None
-    test_database = environ.get("IPGET_TEST_MYSQL_DATABASE")
+    test_database = _TEST_ENV.get("IPGET_TEST_MYSQL_DATABASE")
     return GenericDatabaseSettings(
         username=test_user,
         password=test_password,
@@ -99,14 +140,14 @@ def env_testing_mysql_settings() -> GenericDatabaseSettings:
     )
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def env_testing_postgres_settings() -> GenericDatabaseSettings:
-    test_user = environ.get("IPGET_TEST_POSTGRES_USERNAME")
-    test_password = environ.get("IPGET_TEST_POSTGRES_PASSWORD")
-    test_host = environ.get("IPGET_TEST_POSTGRES_HOST")
-    port = environ.get("IPGET_TEST_POSTGRES_PORT")
+    test_user = _TEST_ENV.get("IPGET_TEST_POSTGRES_USERNAME")
+    test_password = _TEST_ENV.get("IPGET_TEST_POSTGRES_PASSWORD")
+    test_host = _TEST_ENV.get("IPGET_TEST_POSTGRES_HOST")
+    port = _TEST_ENV.get("IPGET_TEST_POSTGRES_PORT")
     test_port = int(port) if port else None
-    test_database = environ.get("IPGET_TEST_POSTGRES_DATABASE")
+    test_database = _TEST_ENV.get("IPGET_TEST_POSTGRES_DATABASE")
     return GenericDatabaseSettings(
         username=test_user,
         password=test_password,
@@ -116,10 +157,12 @@ def env_testing_postgres_settings() -> GenericDatabaseSettings:
     )
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def env_testing_healthcheck_settings():
-    test_server = environ.get("IPGET_TEST_HEALTHCHECK_SERVER") or "https://hc-ping.com"
-    test_uuid = environ.get("IPGET_TEST_HEALTHCHECK_UUID")
+    test_server = (
+        _TEST_ENV.get("IPGET_TEST_HEALTHCHECK_SERVER") or "https://hc-ping.com"
+    )
+    test_uuid = _TEST_ENV.get("IPGET_TEST_HEALTHCHECK_UUID")
     return HealthcheckSettings(server=test_server, uuid=test_uuid)
 
 
@@ -133,14 +176,14 @@ def dummy_healthcheck(monkeypatch):
 @pytest.fixture
 def mock_healthcheck_with_response(monkeypatch: MonkeyPatch):
     def response_200(*args, **kwargs):
-        return FakeResponse(200)
+        return _OK_RESPONSE
 
     monkeypatch.setenv(HEALTHCHECK_SERVER_ENV, "https://pytest.example.com")
     monkeypatch.setenv(HEALTHCHECK_UUID_ENV, "pytest-uuid")
-    monkeypatch.setattr(req, "urlopen", response_200)
+    monkeypatch.setattr(healthchecks._POOL, "request", response_200)
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def env_testing_notification_settings() -> NotificationSettings:
-    test_webhook = environ.get("IPGET_TEST_DISCORD_WEBHOOK")
+    test_webhook = _TEST_ENV.get("IPGET_TEST_DISCORD_WEBHOOK")
     return NotificationSettings(discord_webhook=test_webhook)
@@ -1,27 +1,45 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from ipaddress import IPv4Address
 from os import environ
+from pathlib import Path
 
 import pytest
+import sqlalchemy
 from pytest import MonkeyPatch
+from sqlalchemy import inspect
 
-from ipget.alchemy import MySQL, PostgreSQL, SQLite, get_database
+from ipget import alchemy
+from ipget.alchemy import (
+    TABLE_NAME,
+    MySQL,
+    PostgreSQL,
+    SQLite,
+    _get_database,
+    get_database,
+)
 from ipget.errors import ConfigurationError
+from ipget.settings import SQLiteDatabaseSettings
 
-MYSQL_TEST_REQUIRES = [
-    environ.get("IPGET_TEST_MYSQL_USERNAME"),
-    environ.get("IPGET_TEST_MYSQL_PASSWORD"),
-    environ.get("IPGET_TEST_MYSQL_HOST"),
-    environ.get("IPGET_TEST_MYSQL_PORT"),
-    environ.get("IPGET_TEST_MYSQL_DATABASE"),
-]
-POSTGRES_TEST_REQUIRES = [
-    environ.get("IPGET_TEST_POSTGRES_USERNAME"),
-    environ.get("IPGET_TEST_POSTGRES_PASSWORD"),
-    environ.get("IPGET_TEST_POSTGRES_HOST"),
-    environ.get("IPGET_TEST_POSTGRES_PORT"),
-    environ.get("IPGET_TEST_POSTGRES_DATABASE"),
-]
+_MYSQL_READY = all(
+    environ.get(key)
+    for key in (
+        "IPGET_TEST_MYSQL_USERNAME",
+        "IPGET_TEST_MYSQL_PASSWORD",
+        "IPGET_TEST_MYSQL_HOST",
+        "IPGET_TEST_MYSQL_PORT",
+        "IPGET_TEST_MYSQL_DATABASE",
+    )
+)
+_POSTGRES_READY = all(
+    environ.get(key)
+    for key in (
+        "IPGET_TEST_POSTGRES_USERNAME",
+        "IPGET_TEST_POSTGRES_PASSWORD",
+        "IPGET_TEST_POSTGRES_HOST",
+        "IPGET_TEST_POSTGRES_PORT",
+        "IPGET_TEST_POSTGRES_DATABASE",
+    )
+)
 
 
 def return_none(*args, **kwargs):
@@ -29,6 +47,12 @@ def return_none(*args, **kwargs):
 
 
 class TestGetDatabase:
+    @pytest.fixture(autouse=True)
+    def clear_database_cache(self):
+        _get_database.cache_clear()
+        yield
+        _get_database.cache_clear()
+
     def test_get_mysql(self, monkeypatch: MonkeyPatch):
         # sourcery skip: class-extract-method
         monkeypatch.setattr(MySQL, "__init__", return_none)
@@ -60,6 +84,40 @@ class TestGetDatabase:
         with pytest.raises(ConfigurationError):
             get_database("invalid")
 
+    def test_cached(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setattr(SQLite, "__init__", return_none)
+        assert get_database("SQLite") is get_database("sqlite")
+
+
+class TestGenericEnvironment:
+    @pytest.fixture
+    def generic_env(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setattr(MySQL, "create_engine", return_none)
+        monkeypatch.setattr(MySQL, "create_table", return_none)
+        monkeypatch.setenv("IPGET_USERNAME", "test_user")
+        monkeypatch.setenv("IPGET_PASSWORD", "test_password")
+        monkeypatch.setenv("IPGET_HOST", "db.example.com")
+        monkeypatch.setenv("IPGET_PORT", "4242")
+        monkeypatch.setenv("IPGET_DATABASE", "test_db")
+
+    def test_load_environment(self, generic_env):
+        db = MySQL()
+        assert db.username == "test_user"
+        assert db.password == "test_password"
+        assert db.host == "db.example.com"
+        assert db.port == 4242
+        assert db.database == "test_db"
+
+    def test_missing_env_var(self, generic_env, monkeypatch: MonkeyPatch):
+        monkeypatch.delenv("IPGET_HOST")
+        with pytest.raises(ConfigurationError, match="IPGET_HOST"):
+            MySQL()
+
+    def test_invalid_port(self, generic_env, monkeypatch: MonkeyPatch):
+        monkeypatch.setenv("IPGET_PORT", "not_a_port")
+        with pytest.raises(ConfigurationError, match="IPGET_PORT"):
+            MySQL()
+
 
 class TestSQLite:
     def test_write_data(
@@ -69,6 +127,42 @@ class TestSQLite:
         assert isinstance(new_id, int)
         assert new_id > -1
 
+    def test_write_many(
+        self,
+        ip_data_static: tuple[datetime, IPv4Address],
+        ip_data_random: tuple[datetime, IPv4Address],
+        sqlite_in_memory: SQLite,
+    ):
+        db = sqlite_in_memory
+        new_ids = db.write_many([ip_data_static, ip_data_random])
+        assert len(new_ids) == 2
+        assert new_ids[1] == new_ids[0] + 1
+        last = db.get_last()
+        assert last is not None
+        assert last[0] == new_ids[1]
+
+    def test_write_many_without_returning(
+        self,
+        ip_data_static: tuple[datetime, IPv4Address],
+        sqlite_in_memory: SQLite,
+        monkeypatch: MonkeyPatch,
+    ):
+        db = sqlite_in_memory
+        monkeypatch.setattr(db.engine.dialect, "insert_executemany_returning", False)
+        new_ids = db.write_many([ip_data_static, ip_data_static])
+        assert new_ids[1] == new_ids[0] + 1
+
+    def test_write_data_without_returning(
+        self,
+        ip_data_static: tuple[datetime, IPv4Address],
+        sqlite_in_memory: SQLite,
+        monkeypatch: MonkeyPatch,
+    ):
+        db = sqlite_in_memory
+        first_id = db.write_data(*ip_data_static)
+        monkeypatch.setattr(db.engine.dialect, "insert_returning", False)
+        assert db.write_data(*ip_data_static) == first_id + 1
+
     def test_missing_env_var(self, monkeypatch: MonkeyPatch):
         monkeypatch.delenv("IPGET_DATABASE", raising=False)
         monkeypatch.setattr(SQLite, "create_engine", return_none)
@@ -90,11 +184,130 @@ class TestSQLite:
         last_id, last_datetime, last_ip = last
         assert last_id == new_id
         assert last_datetime == ip_data_random[0].replace(tzinfo=None)
-        assert last_ip == ip_data_random[1]
+        assert last_ip == str(ip_data_random[1])
+
+    def test_get_last_cached(
+        self,
+        ip_data_static: tuple[datetime, IPv4Address],
+        ip_data_random: tuple[datetime, IPv4Address],
+        sqlite_in_memory: SQLite,
+    ):
+        db = sqlite_in_memory
+        db.write_data(*ip_data_static)
+        last = db.get_last()
+        assert db.get_last() is last
+        later = ip_data_static[0] + timedelta(seconds=1)
+        new_id = db.write_data(later, ip_data_random[1])
+        last = db.get_last()
+        assert last is not None
+        assert last[0] == new_id
+
+    def test_create_table(self, tmp_path: Path):
+        settings = SQLiteDatabaseSettings(database_file_path=tmp_path / "test.db")
+        assert SQLite(settings).created_new_table
+        assert not SQLite(settings).created_new_table
+
+    def test_shared_engine(self, tmp_path: Path):
+        settings = SQLiteDatabaseSettings(database_file_path=tmp_path / "test.db")
+        assert SQLite(settings).engine is SQLite(settings).engine
+
+    @pytest.mark.no_test_env
+    def test_in_memory_engine_not_shared(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setenv("IPGET_DATABASE", ":memory:")
+        assert SQLite().engine is not SQLite().engine
+
+    def test_pragmas(self, tmp_path: Path):
+        settings = SQLiteDatabaseSettings(database_file_path=tmp_path / "test.db")
+        with SQLite(settings).engine.connect() as connection:
+            journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+            synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+
+    def test_pragma_overrides(self, tmp_path: Path):
+        settings = SQLiteDatabaseSettings(
+            database_file_path=tmp_path / "test.db",
+            journal_mode="delete",  # type: ignore
+            synchronous="full",  # type: ignore
+        )
+        with SQLite(settings).engine.connect() as connection:
+            journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+            synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+        assert journal_mode == "delete"
+        assert synchronous == 2  # FULL
+
+    def test_time_index(self, sqlite_in_memory: SQLite):
+        indexes = inspect(sqlite_in_memory.engine).get_indexes(TABLE_NAME)
+        assert f"ix_{TABLE_NAME}_time_desc" in [index["name"] for index in indexes]
+
+    def test_time_index_existing_table(self, tmp_path: Path):
+        database_path = tmp_path / "test.db"
+        engine = sqlalchemy.create_engine(f"sqlite:///{database_path}")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"CREATE TABLE {TABLE_NAME} (ID INTEGER PRIMARY KEY, "
+                "time DATETIME NOT NULL, ip_address VARCHAR(80))"
+            )
+        engine.dispose()
+        db = SQLite(SQLiteDatabaseSettings(database_file_path=database_path))
+        assert not db.created_new_table
+        indexes = inspect(db.engine).get_indexes(TABLE_NAME)
+        assert f"ix_{TABLE_NAME}_time_desc" not in [index["name"] for index in indexes]
+        db.upgrade_table()
+        indexes = inspect(db.engine).get_indexes(TABLE_NAME)
+        assert f"ix_{TABLE_NAME}_time_desc" in [index["name"] for index in indexes]
+
+    def test_probe_error_existing_table(self, tmp_path: Path, monkeypatch: MonkeyPatch):
+        database_path = tmp_path / "test.db"
+        engine = sqlalchemy.create_engine(f"sqlite:///{database_path}")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"CREATE TABLE {TABLE_NAME} (ID INTEGER PRIMARY KEY, "
+                "time DATETIME NOT NULL, ip_address VARCHAR(45))"
+            )
+        engine.dispose()
+        # Fails, as a busy or unreachable database would, although the table exists
+        monkeypatch.setattr(
+            alchemy, "_TABLE_PROBE", sqlalchemy.text(f"SELECT nope FROM {TABLE_NAME}")
+        )
+        with pytest.raises(sqlalchemy.exc.OperationalError):
+            SQLite(SQLiteDatabaseSettings(database_file_path=database_path))
+
+    def test_write_and_get_previous(
+        self,
+        ip_data_static: tuple[datetime, IPv4Address],
+        ip_data_random: tuple[datetime, IPv4Address],
+        sqlite_in_memory: SQLite,
+    ):
+        db = sqlite_in_memory
+        first_id, first_previous = db.write_and_get_previous(*ip_data_static)
+        assert first_previous is None
+        new_id, previous_ip = db.write_and_get_previous(*ip_data_random)
+        assert new_id > first_id
+        assert previous_ip == str(ip_data_static[1])
+
+    def test_write_and_get_previous_immediate(
+        self,
+        ip_data_static: tuple[datetime, IPv4Address],
+        sqlite_in_memory: SQLite,
+    ):
+        statements: list[str] = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = sqlite_in_memory.engine
+        sqlalchemy.event.listen(engine, "before_cursor_execute", capture)
+        try:
+            sqlite_in_memory.write_and_get_previous(*ip_data_static)
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", capture)
+        assert statements[0] == "BEGIN IMMEDIATE"
+        assert sqlite_in_memory.get_last() is not None
 
 
 @pytest.mark.skipif(
-    condition=not all(MYSQL_TEST_REQUIRES),
+    condition=not _MYSQL_READY,
     reason="MySQL requirements not given in .env.test",
 )
 class TestMySQL:
@@ -121,11 +334,11 @@ class TestMySQL:
         last_id, last_datetime, last_ip = last
         assert last_id == new_id
         assert last_datetime == ip_data_random[0].replace(tzinfo=None)
-        assert last_ip == ip_data_random[1]
+        assert last_ip == str(ip_data_random[1])
 
 
 @pytest.mark.skipif(
-    condition=not all(POSTGRES_TEST_REQUIRES),
+    condition=not _POSTGRES_READY,
     reason="PostgreSQL requirements not given in .env.test",
 )
 class TestPostgreSQL:
@@ -157,4 +370,15 @@ class TestPostgreSQL:
 
         assert last_id == new_id
         assert last_datetime == given_datetime.replace(tzinfo=None)
-        assert last_ip == given_ip
+        assert last_ip == str(given_ip)
+
+    def test_write_and_get_previous(
+        self,
+        ip_data_random: tuple[datetime, IPv4Address],
+        env_testing_postgres_settings,
+    ):
+        db = PostgreSQL(env_testing_postgres_settings)
+        db.write_data(*ip_data_random)
+        new_id, previous_ip = db.write_and_get_previous(*ip_data_random)
+        assert new_id > 0
+        assert previous_ip == str(ip_data_random[1])
@@ -1,11 +1,10 @@
 from datetime import datetime, timezone
-from http.client import HTTPResponse
 from os import environ
-from urllib.error import HTTPError
 from uuid import UUID
 
 import pytest
 from pytest import MonkeyPatch
+from urllib3 import BaseHTTPResponse
 
 from ipget.environment import HEALTHCHECK_SERVER_ENV, HEALTHCHECK_UUID_ENV
 from ipget.errors import ConfigurationError
@@ -18,6 +17,14 @@ HEALTHCHECK_REQUIRES = [
 ]
 
 
+@pytest.fixture(scope="class")
+def healthcheck() -> HealthCheck:
+    """A HealthCheck shared by a test class, requests still need to be mocked."""
+    return HealthCheck(
+        HealthcheckSettings(server="https://pytest.example.com", uuid="pytest-uuid")
+    )
+
+
 def test_encode_payload_data():
     payload = {"test": 123, "ip": "10.10.10.0"}
     result = HealthCheck._encode_payload_data(payload)
@@ -60,42 +67,48 @@ class TestHealthCheckConfig:
         id2 = dummy_healthcheck.regen_uuid()
         assert id1 != id2
 
+    def test_regen_uuid_ping_url(self, dummy_healthcheck):
+        new_rid = dummy_healthcheck.regen_uuid()
+        assert dummy_healthcheck._get_ping_url("start").endswith(f"?rid={new_rid}")
+
 
 class TestHealthCheckPings:
-    def test_start(self, mock_healthcheck_with_response):
-        hc = HealthCheck()
+    def test_start(self, mock_healthcheck_with_response, healthcheck):
+        hc = healthcheck
         hc.start(payload={"test": "Start"})
         assert "/start?" in hc._url
 
-    def test_success(self, mock_healthcheck_with_response):
-        hc = HealthCheck()
+    def test_success(self, mock_healthcheck_with_response, healthcheck):
+        hc = healthcheck
         data = {"test": "Success", "ip": "10.10.10.0"}
         hc.success(payload=data)
         assert hc._url.endswith(f"{hc._check_uuid}?rid={hc.get_rid()}")
 
-    def test_fail(self, mock_healthcheck_with_response):
-        hc = HealthCheck()
+    def test_fail(self, mock_healthcheck_with_response, healthcheck):
+        hc = healthcheck
         hc.fail(payload={"test": "Failure"})
         assert "/fail?" in hc._url
 
-    def test_returncode(self, mock_healthcheck_with_response):
-        hc = HealthCheck()
+    def test_returncode(self, mock_healthcheck_with_response, healthcheck):
+        hc = healthcheck
         hc.returncode(0, payload={"test": "returncode"})
         assert "/0?" in hc._url
 
+    def test_invalid_ping_type(self, dummy_healthcheck):
+        with pytest.raises(ValueError):
+            dummy_healthcheck._get_ping_url("invalid")
+
+    @pytest.mark.integration
     @pytest.mark.skipif(
         condition=not environ.get("IPGET_TEST_HEALTHCHECK_UUID"),
         reason="Healthcheck UUID not given in .env.test",
     )
     def test_real_healthcheck(self, env_testing_healthcheck_settings):
         hc = HealthCheck(env_testing_healthcheck_settings)
-        try:
-            response = hc.success(
-                payload={
-                    "test": datetime.now(timezone.utc).isoformat(timespec="minutes")
-                }
-            )
-        except HTTPError as e:
-            pytest.skip(reason=f"Encountered HTTP Error {e.getcode()} {e.name}")
-        assert isinstance(response, HTTPResponse)
-        assert response.getcode() == 200
+        response = hc.success(
+            payload={"test": datetime.now(timezone.utc).isoformat(timespec="minutes")}
+        )
+        if response is None:
+            pytest.skip(reason="Healthcheck server returned an HTTP error")
+        assert isinstance(response, BaseHTTPResponse)
+        assert response.status == 200
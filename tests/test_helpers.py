@@ -3,11 +3,15 @@ import os
 from pathlib import Path
 
 import pytest
-from hypothesis import assume, example, given
+from hypothesis import example, given
 from hypothesis import strategies as st
 
 from ipget.helpers import custom_namer
 
+_ALPHA_LNS = st.characters(categories=["L", "N", "S"])
+_STEM = st.text(min_size=1, alphabet=_ALPHA_LNS)
+_SUFFIX = st.text(min_size=1, max_size=10, alphabet=_ALPHA_LNS)
+
 
 @pytest.fixture
 def mock_datetime_now(monkeypatch):
@@ -32,48 +36,50 @@ def mock_datetime_now(monkeypatch):
     monkeypatch.setattr(datetime, "datetime", MockDatetime)
 
 
+@pytest.fixture(scope="module")
+def today():
+    """
+    Freezes the current datetime for the rest of the module, so the expected
+    names still match `custom_namer` if the tests run across midnight.
+
+    Yields:
+        datetime.date: The frozen date.
+    """
+    frozen = datetime.datetime.now()
+
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(datetime, "datetime", FrozenDatetime)
+        yield frozen.date()
+
+
 class TestCustomNamer:
     def test_actual(self, mock_datetime_now):
         default_log_file_name = "/app/logs/ipget.log"
         new_file_name = custom_namer(default_log_file_name)
         if os.name == "nt":
-            assert new_file_name == "C:\\app\\logs\\ipget.1963-11-23.log"
+            assert new_file_name == "\\app\\logs\\ipget.1963-11-23.log"
         else:
             assert new_file_name == "/app/logs/ipget.1963-11-23.log"
 
-    @given(
-        stem=st.text(min_size=1, alphabet=st.characters(categories=["L", "N", "S"])),
-        suffix=st.text(
-            min_size=1, max_size=10, alphabet=st.characters(categories=["L", "N", "S"])
-        ),
-    )
+    @given(stem=_STEM, suffix=_SUFFIX)
     @example(stem="ipget", suffix="log")
-    def test_expected_input(self, stem: str, suffix: str):
-        assume(all([stem, suffix]))
-
+    def test_expected_input(self, today: datetime.date, stem: str, suffix: str):
         input_name = f"{stem}.{suffix}"
-        expected_output = f"{stem}.{datetime.datetime.now().date()}.log"
+        expected_output = f"{stem}.{today}.log"
 
         result = custom_namer(input_name)
 
         assert Path(result).name == expected_output
 
-    @given(
-        stem=st.text(
-            min_size=1,
-            alphabet=st.characters(categories=["L", "N", "S"]),
-        ),
-        suffix=st.text(
-            min_size=1,
-            max_size=10,
-            alphabet=st.characters(categories=["L", "N", "S"]),
-        ),
-    )
-    def test_multiple_suffixes(self, stem, suffix):
-        assume(all([stem, suffix]))
-
+    @given(stem=_STEM, suffix=_SUFFIX)
+    def test_multiple_suffixes(self, today, stem, suffix):
         input_name = f"{stem}.{suffix}.{suffix}"
-        expected_output = f"{stem}.{suffix}.{datetime.datetime.now().date()}.log"
+        expected_output = f"{stem}.{suffix}.{today}.log"
 
         result = custom_namer(input_name)
 
@@ -100,8 +106,7 @@ class TestCustomNamer:
         with pytest.raises(ValueError):
             custom_namer(name)
 
-    @given(name=st.text(min_size=1))
+    @given(name=st.text(min_size=1, alphabet=st.characters(exclude_characters=".")))
     def test_invalid_input(self, name):
-        assume("." not in name)
         with pytest.raises(ValueError):
             custom_namer(name)
@@ -5,10 +5,17 @@ from os import environ
 import pytest
 from pytest import MonkeyPatch
 from requests import ConnectionError, HTTPError, Response
+from urllib3 import HTTPResponse
 
 from ipget.environment import DISCORD_WEBHOOK_ENV
 from ipget.errors import ConfigurationError
-from ipget.notifications import Discord
+from ipget.notifications import (
+    _RETRY,
+    MESSAGE_LIMIT,
+    Discord,
+    _batch_messages,
+    _render_errors,
+)
 
 
 class TestDiscord:
@@ -66,6 +73,64 @@ class TestDiscord:
         assert "IPGET_TEST_NOTIFICATION_1" in discord._webhook.content
         assert "IPGET_TEST_NOTIFICATION_2" in discord._webhook.content
 
+    def test_batched_messages(self, mock_discord_with_response):
+        discord = Discord()
+        assert discord.enqueue("first") == 200
+        assert discord.enqueue("second") is None
+        assert discord.enqueue("third") is None
+        assert discord.flush() == 200
+        assert discord._webhook.content == "second\n---\nthird"
+        assert discord.flush() is None
+
+    def test_batch_length_limit(self):
+        messages = ["a" * 1500, "b" * 1500, "c" * 3000]
+        payloads = _batch_messages(messages)
+        assert payloads == ["a" * 1500, "b" * 1500, "c" * MESSAGE_LIMIT]
+
+    def test_render_many_errors(self):
+        errors = [ConfigurationError(f"IPGET_TEST_{i}") for i in range(10_000)]
+        message = _render_errors(errors)
+        assert "IPGET_TEST_0\n" in message
+        assert "IPGET_TEST_9999" not in message
+        assert MESSAGE_LIMIT <= len(message) < 2 * MESSAGE_LIMIT
+
+    def test_session_retries(self, mock_discord_with_response):
+        discord = Discord()
+        adapter = discord._session.get_adapter(discord.webhook_url)
+        assert adapter.max_retries.status_forcelist == (429,)
+        assert adapter.max_retries.respect_retry_after_header
+        assert discord._webhook.rate_limit_retry is False
+
+    @pytest.mark.parametrize(("header", "expected"), [("5", 5), ("600", 30)])
+    def test_retry_after_capped(self, header: str, expected: float):
+        response = HTTPResponse(status=429, headers={"Retry-After": header})
+        assert _RETRY.get_retry_after(response) == expected
+
+    def test_session_not_in_payload(self, mock_discord_with_response):
+        discord = Discord()
+        discord.notify_error([ConfigurationError("IPGET_TEST_NOTIFICATION")])
+        assert "session" not in discord._webhook.json
+
+    def test_previous_response_not_in_payload(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setenv(DISCORD_WEBHOOK_ENV, "https://test.example.com")
+        payloads: list[dict] = []
+
+        def post(url, json, **kwargs):
+            payloads.append(json)
+            response = Response()
+            response.status_code = 200
+            response._content = b'{"id": "42", "attachments": [{"id": "1"}]}'
+            return response
+
+        discord = Discord()
+        monkeypatch.setattr(discord._session, "post", post)
+        discord._send_basic_message("first")
+        discord._send_basic_message("second")
+        assert payloads[1]["content"] == "second"
+        assert "id" not in payloads[1]
+        assert "attachments" not in payloads[1]
+
+    @pytest.mark.integration
     @pytest.mark.skipif(
         condition=not environ.get("IPGET_TEST_DISCORD_WEBHOOK"),
         reason="Discord webhook not given in .env.test",
@@ -1,11 +1,18 @@
 from pathlib import Path
 
-import custom_strategies as cst
 import pytest
 from hypothesis import assume, example, given
 from hypothesis import strategies as st
 from pydantic import ValidationError
-
+from pytest import MonkeyPatch
+
+from ipget.environment import (
+    DATABASE_TYPE_ENV,
+    DISCORD_WEBHOOK_ENV,
+    FAST_SETTINGS_ENV,
+    HEALTHCHECK_SERVER_ENV,
+    HEALTHCHECK_UUID_ENV,
+)
 from ipget.settings import (
     AppSettings,
     GenericDatabaseSettings,
@@ -13,10 +20,21 @@ from ipget.settings import (
     LoggerSettings,
     NotificationSettings,
     SQLiteDatabaseSettings,
+    clear_settings_cache,
+    get_app_settings,
+    get_healthcheck_settings,
+    get_notification_settings,
 )
 
 LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 DATABASE_TYPES = ["SQLite", "MySQL", "MariaDB", "Postgres", "PostgreSQL"]
+VALID_DATABASE_SETTINGS = {
+    "username": "test_user",
+    "password": "test_password",
+    "host": "db.example.com",
+    "port": 4242,
+    "database_name": "test_db",
+}
 
 
 class TestLoggerSettings:
@@ -24,10 +42,11 @@ class TestLoggerSettings:
         settings = LoggerSettings()
         assert settings.level == "INFO"
         assert settings.file_path == Path("/app/logs")
+        assert settings.stdout_only is False
 
-    # @pytest.mark.parametrize("level", LOG_LEVELS)
-    # @given(level=cst.log_levels())
-    @given(cst.random_casing(LOG_LEVELS))
+    @pytest.mark.parametrize(
+        "level", LOG_LEVELS + [s.lower() for s in LOG_LEVELS] + ["Info", "dEbUg"]
+    )
     def test_valid_log_levels(self, level: str):
         settings = LoggerSettings(level=level)  # type: ignore
         assert settings.level == level.upper()
@@ -100,6 +119,8 @@ class TestSQLiteDatabaseSettings:
     def test_default_values(self):
         settings = SQLiteDatabaseSettings()
         assert settings.database_file_path == Path("/app/public_ip.db")
+        assert settings.journal_mode == "WAL"
+        assert settings.synchronous == "NORMAL"
 
     @given(custom_path=st.builds(Path, st.text()) | st.text())
     def test_valid_database_file_path(self, custom_path):
@@ -145,63 +166,16 @@ class TestGenericDatabaseSettings:
         assert settings.port == port
         assert settings.database_name == db_name
 
-    @given(bad_user=st.integers())
-    def test_invalid_user(self, bad_user: str):
-        test_settings = {
-            "username": bad_user,
-            "password": "test_password",
-            "host": "db.example.com",
-            "port": 4242,
-            "database_name": "test_db",
-        }
-        with pytest.raises(ValidationError):
-            GenericDatabaseSettings(**test_settings)  # type: ignore
-
-    @given(bad_password=st.integers())
-    def test_invalid_password(self, bad_password: str):
-        test_settings = {
-            "username": "test_user",
-            "password": bad_password,
-            "host": "db.example.com",
-            "port": 4242,
-            "database_name": "test_db",
-        }
-        with pytest.raises(ValidationError):
-            GenericDatabaseSettings(**test_settings)  # type: ignore
-
-    @given(bad_host=st.integers())
-    def test_invalid_host(self, bad_host: str):
-        test_settings = {
-            "username": "test_user",
-            "password": "test_password",
-            "host": bad_host,
-            "port": 4242,
-            "database_name": "test_db",
-        }
+    @pytest.mark.parametrize("field", ["username", "password", "host", "database_name"])
+    @given(bad_value=st.integers())
+    def test_invalid_field(self, field: str, bad_value: int):
+        test_settings = {**VALID_DATABASE_SETTINGS, field: bad_value}
         with pytest.raises(ValidationError):
             GenericDatabaseSettings(**test_settings)  # type: ignore
 
     @given(bad_port=st.text(alphabet=st.characters(categories=["L", "P", "S"])))
     def test_invalid_port(self, bad_port: str):
-        test_settings = {
-            "username": "test_user",
-            "password": "test_password",
-            "host": "db.example.com",
-            "port": bad_port,
-            "database_name": "test_db",
-        }
-        with pytest.raises(ValidationError):
-            GenericDatabaseSettings(**test_settings)  # type: ignore
-
-    @given(bad_db_name=st.integers())
-    def test_invalid_db_name(self, bad_db_name: str):
-        test_settings = {
-            "username": "test_user",
-            "password": "test_password",
-            "host": "db.example.com",
-            "port": 4242,
-            "database_name": bad_db_name,
-        }
+        test_settings = {**VALID_DATABASE_SETTINGS, "port": bad_port}
         with pytest.raises(ValidationError):
             GenericDatabaseSettings(**test_settings)  # type: ignore
 
@@ -210,9 +184,13 @@ class TestAppSettings:
     def test_default_values(self):
         settings = AppSettings()
         assert settings.db_type == "sqlite"
+        assert settings.ip_cache_file is None
+        assert settings.upgrade_database is False
 
-    # @given(valid_mode=st.sampled_from(DATABASE_TYPES))
-    @given(cst.random_casing(DATABASE_TYPES))
+    @pytest.mark.parametrize(
+        "valid_mode",
+        DATABASE_TYPES + [s.lower() for s in DATABASE_TYPES] + ["SQLITE", "mYsQl"],
+    )
     def test_valid_db_type(self, valid_mode: str):
         settings = AppSettings(db_type=valid_mode)  # type: ignore
         assert settings.db_type == valid_mode.lower()
@@ -222,3 +200,30 @@ class TestAppSettings:
         assume(invalid_mode not in DATABASE_TYPES)
         with pytest.raises(ValidationError):
             AppSettings(db_type=invalid_mode)  # type: ignore
+
+
+class TestCachedSettings:
+    def test_cached(self):
+        assert get_app_settings() is get_app_settings()
+
+    def test_clear_cache(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setenv(DATABASE_TYPE_ENV, "sqlite")
+        assert get_app_settings().db_type == "sqlite"
+        monkeypatch.setenv(DATABASE_TYPE_ENV, "mysql")
+        assert get_app_settings().db_type == "sqlite"
+        clear_settings_cache()
+        assert get_app_settings().db_type == "mysql"
+
+    def test_fast_settings(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setenv(FAST_SETTINGS_ENV, "1")
+        monkeypatch.delenv(HEALTHCHECK_SERVER_ENV, raising=False)
+        monkeypatch.setenv(HEALTHCHECK_UUID_ENV, "pytest-fast-settings")
+        settings = get_healthcheck_settings()
+        assert settings.server == "https://hc-ping.com"
+        assert settings.uuid == "pytest-fast-settings"
+
+    def test_fast_notification_settings(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setenv(FAST_SETTINGS_ENV, "true")
+        monkeypatch.setenv(DISCORD_WEBHOOK_ENV, "https://pytest.example.com")
+        settings = get_notification_settings()
+        assert settings.discord_webhook == "https://pytest.example.com"